@@ -1,9 +1,20 @@
 import abc
 import dataclasses
 import logging
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.dataset
 import enum
-import uuid
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernel still runs as plain Python.
+
+    def njit(func):
+        return func
+
 
 pd.set_option("display.width", 1000)
 pd.set_option("display.max_columns", None)
@@ -39,36 +50,88 @@ class Side(enum.Enum):
     SELL = "SELL"
 
 
-@dataclasses.dataclass
+# Integer codes for the structure-of-arrays pending-order book.
+KIND_MARKET = 0
+KIND_LIMIT = 1
+KIND_STOP = 2
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+
+@njit
+def _bollinger_bands(
+    values: np.ndarray, window: int, num_std: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute rolling mean and Bollinger bands in one pass.
+
+    Maintains a running sum and sum of squares over the window, so the
+    mean, upper and lower band arrays are produced in a single traversal
+    instead of one rolling pass per output. Windows containing NaN input
+    (e.g. the detrend warm-up) yield NaN, matching pandas rolling
+    semantics, and the std uses the same ddof=1 as pandas.
+    """
+    n = len(values)
+    mean = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    total = 0.0
+    total_sq = 0.0
+    valid = 0
+    for i in range(n):
+        new = values[i]
+        if not np.isnan(new):
+            total += new
+            total_sq += new * new
+            valid += 1
+        if i >= window:
+            old = values[i - window]
+            if not np.isnan(old):
+                total -= old
+                total_sq -= old * old
+                valid -= 1
+        if valid == window:
+            m = total / window
+            var = (total_sq - window * m * m) / (window - 1)
+            if var < 0.0:
+                var = 0.0
+            band = num_std * np.sqrt(var)
+            mean[i] = m
+            upper[i] = m + band
+            lower[i] = m - band
+    return mean, upper, lower
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
 class OrderBase:
-    order_id: uuid.UUID
+    order_id: int
     ts_event: pd.Timestamp
     order_direction: Side
     quantity: float
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True, frozen=True)
 class MarketOrder(OrderBase):
     order_type: OrderType = OrderType.MARKET
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True, frozen=True)
 class LimitOrder(OrderBase):
     limit_price: float
     order_type: OrderType = OrderType.LIMIT
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True, frozen=True)
 class StopOrder(OrderBase):
     stop_price: float
     order_type: OrderType = OrderType.STOP
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True, frozen=True)
 class Trade:
-    trade_id: uuid.UUID
-    ts_event: pd.Timestamp
-    associated_order_id: uuid.UUID
+    trade_id: int
+    ts_event: int  # Nanoseconds since epoch
+    associated_order_id: int
     trade_direction: Side
     quantity: float
     fill_at: float  # Point value where the futures contract was filled
@@ -127,10 +190,30 @@ class SingleContractBacktesterBase(abc.ABC):
         self._cash = 100_000.0
         self._current_contract: Contract | None = None
         self._total_fees_per_contract: float = 0.0
-
-        self.pending_market_orders: dict[uuid.UUID, MarketOrder] = {}
-        self.pending_limit_orders: dict[uuid.UUID, LimitOrder] = {}
-        self.pending_stop_orders: dict[uuid.UUID, StopOrder] = {}
+        self._fees_in_points: float = 0.0
+
+        self._order_capacity = 1024
+        self._order_count = 0
+        self._order_scan_start = 0
+        self._order_kinds = np.zeros(self._order_capacity, dtype=np.int8)
+        self._order_sides = np.zeros(self._order_capacity, dtype=np.int8)
+        self._order_prices = np.zeros(self._order_capacity)
+        self._order_quantities = np.zeros(self._order_capacity)
+        self._order_alive = np.zeros(self._order_capacity, dtype=np.bool_)
+        self._order_refs: list[OrderBase] = []
+        self._order_rows: dict[int, int] = {}
+        self._order_id_counter = 0
+        self._trade_id_counter = 0
+
+    def _next_order_id(self) -> int:
+        order_id = self._order_id_counter
+        self._order_id_counter += 1
+        return order_id
+
+    def _next_trade_id(self) -> int:
+        trade_id = self._trade_id_counter
+        self._trade_id_counter += 1
+        return trade_id
 
     def set_contract(self, contract: Contract) -> None:
         self._current_contract = contract
@@ -138,6 +221,7 @@ class SingleContractBacktesterBase(abc.ABC):
             contract.broker_commission_per_contract
             + contract.exchange_fees_per_contract
         )
+        self._fees_in_points = self._total_fees_per_contract / contract.point_value
 
     def set_initial_cash(self, initial_cash: float) -> None:
         self._cash = initial_cash
@@ -147,42 +231,40 @@ class SingleContractBacktesterBase(abc.ABC):
     ) -> None:
         try:
             logger.info(f"Reading CSV file: {path_to_dbcsv}")
-            self._df = pd.read_csv(
-                path_to_dbcsv,
-                usecols=[
-                    "ts_event",
-                    "rtype",
-                    "open",
-                    "high",
-                    "low",
-                    "close",
-                    "volume",
-                    "symbol",
-                ],
-                dtype={
-                    "ts_event": int,
-                    "rtype": int,
-                    "open": int,
-                    "high": int,
-                    "low": int,
-                    "close": int,
-                    "volume": int,
-                    "symbol": str,
-                },
+            column_types = {
+                "ts_event": pa.int64(),
+                "rtype": pa.int64(),
+                "open": pa.int64(),
+                "high": pa.int64(),
+                "low": pa.int64(),
+                "close": pa.int64(),
+                "volume": pa.int64(),
+                "symbol": pa.dictionary(pa.int32(), pa.string()),
+            }
+            csv_format = pyarrow.dataset.CsvFileFormat(
+                convert_options=pyarrow.csv.ConvertOptions(column_types=column_types)
             )
+            dataset = pyarrow.dataset.dataset(path_to_dbcsv, format=csv_format)
 
+            symbol_filter = None
             if symbol is not None:
                 logger.info(f"Filtering data for symbol {symbol}")
-                self._df = self._df[self._df["symbol"] == symbol]
+                symbol_filter = pyarrow.dataset.field("symbol") == symbol
+            table = dataset.to_table(filter=symbol_filter, columns=list(column_types))
+            self._df = table.to_pandas()
 
             logger.info(
                 "Converting timestamps and price values to human-readable formats"
             )
             self._df["ts_event"] = pd.to_datetime(self._df["ts_event"], unit="ns")
-            self._df["open"] = self._df["open"] / 1e9
-            self._df["high"] = self._df["high"] / 1e9
-            self._df["low"] = self._df["low"] / 1e9
-            self._df["close"] = self._df["close"] / 1e9
+            price_columns = ["open", "high", "low", "close"]
+            # Scale in float64 so tick-grid prices stay exact, then downcast:
+            # float32 represents all 0.25-tick prices in range exactly and
+            # halves the bandwidth of every rolling/compare pass downstream.
+            prices = np.multiply(self._df[price_columns].to_numpy(), 1e-9).astype(
+                np.float32
+            )
+            self._df[price_columns] = prices
 
             _rtypes = self._df["rtype"].unique().tolist()
             if len(_rtypes) != 1:
@@ -209,19 +291,55 @@ class SingleContractBacktesterBase(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def strategy(self, row: pd.Series) -> None:
+    def strategy(self, bar_index: int) -> None:
         pass
 
     def submit_order(self, order: OrderBase) -> None:
+        if self._order_count == self._order_capacity:
+            self._grow_order_book()
+
+        row = self._order_count
         if isinstance(order, MarketOrder):
-            self.pending_market_orders[order.order_id] = order
-            logger.info(f"Submitted market order {order.order_id}")
+            self._order_kinds[row] = KIND_MARKET
         elif isinstance(order, LimitOrder):
-            self.pending_limit_orders[order.order_id] = order
-            logger.info(f"Submitted limit order {order.order_id}")
+            self._order_kinds[row] = KIND_LIMIT
+            self._order_prices[row] = order.limit_price
         elif isinstance(order, StopOrder):
-            self.pending_stop_orders[order.order_id] = order
-            logger.info(f"Submitted stop order {order.order_id}")
+            self._order_kinds[row] = KIND_STOP
+            self._order_prices[row] = order.stop_price
+        self._order_sides[row] = (
+            SIDE_BUY if order.order_direction is Side.BUY else SIDE_SELL
+        )
+        self._order_quantities[row] = order.quantity
+        self._order_alive[row] = True
+        self._order_refs.append(order)
+        self._order_rows[order.order_id] = row
+        self._order_count += 1
+        logger.info(
+            f"Submitted {order.order_type.value.lower()} order {order.order_id}"
+        )
+
+    def cancel_order(self, order_id: int) -> None:
+        row = self._order_rows.get(order_id)
+        if row is None or not self._order_alive[row]:
+            logger.warning(f"Cannot cancel unknown or inactive order {order_id}")
+            return
+        self._order_alive[row] = False
+        logger.info(f"Cancelled order {order_id}")
+
+    def _grow_order_book(self) -> None:
+        self._order_capacity *= 2
+        for name in (
+            "_order_kinds",
+            "_order_sides",
+            "_order_prices",
+            "_order_quantities",
+            "_order_alive",
+        ):
+            old = getattr(self, name)
+            new = np.zeros(self._order_capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
 
     def run_backtest(self) -> None:
         self.add_indicators()
@@ -229,54 +347,67 @@ class SingleContractBacktesterBase(abc.ABC):
             f"Backtester DataFrame with added Indicators:\n{self._df.head(100).to_string(index=False)}\n"
             f"...\n{self._df.tail().to_string(index=False)}"
         )
-        for _, row in self._df.iterrows():
-            self._process_pending_orders(row)
-            self.strategy(row)
-            logger.debug(f"Processed Bar: {row['ts_event']}")
+        self._columns = {
+            column: self._df[column].to_numpy() for column in self._df.columns
+        }
+        # Iterate timestamps as raw int64 nanoseconds; converting back to
+        # datetime64 only happens at reporting time.
+        ts_ns = self._columns["ts_event"].view("int64")
+        opens = self._columns["open"]
+        n_bars = len(self._df)
+        progress_interval = max(n_bars // 100, 1)
+        for i, (ts_event, bar_open) in enumerate(zip(ts_ns, opens)):
+            self._process_pending_orders(ts_event, bar_open)
+            self.strategy(i)
+            if (i + 1) % progress_interval == 0:
+                logger.debug("Processed %d/%d bars", i + 1, n_bars)
 
     def show_performance_metrics(self) -> None:
         pass
 
-    def _process_pending_orders(self, row: pd.Series) -> None:
+    def _process_pending_orders(self, ts_event, bar_open) -> None:
         if self._current_contract is None:
             raise ValueError(
                 "Contract specifications not set. Call set_contract() first."
             )
 
-        for order_id, order in list(self.pending_market_orders.items()):
-            trade = Trade(
-                trade_id=uuid.uuid4(),
-                ts_event=row["ts_event"],
-                associated_order_id=order.order_id,
-                trade_direction=order.order_direction,
-                quantity=order.quantity,
-                fill_at=row["open"],  # Raw fill price in points
-                commission_and_fees=self._total_fees_per_contract
-                * order.quantity,  # Total fees in dollars
-                fill_adjusted=(
-                    row["open"]
-                    + (
-                        self._total_fees_per_contract
-                        / self._current_contract.point_value
-                    )
-                    if order.order_direction == Side.BUY
-                    else row["open"]
-                    - (
-                        self._total_fees_per_contract
-                        / self._current_contract.point_value
-                    )
-                ),  # Fill price adjusted for fees, expressed in points
-            )
-            self._register_trade_execution(trade)
-            del self.pending_market_orders[order_id]
+        start, n = self._order_scan_start, self._order_count
+        if start == n:
+            return
 
-        # Process pending limit orders
-        for order_id, order in list(self.pending_limit_orders.items()):
-            pass
-
-        # Process pending stop orders
-        for order_id, order in list(self.pending_stop_orders.items()):
-            pass
+        alive = self._order_alive[start:n]
+        market_rows = (
+            np.flatnonzero(alive & (self._order_kinds[start:n] == KIND_MARKET)) + start
+        )
+        if market_rows.size:
+            # One vectorized pass over all market orders hitting this bar:
+            # fees in dollars and fee-adjusted fills in points.
+            fees = self._total_fees_per_contract * self._order_quantities[market_rows]
+            fills_adjusted = (
+                bar_open + self._order_sides[market_rows] * self._fees_in_points
+            )
+            for fee, fill_adjusted, row in zip(fees, fills_adjusted, market_rows):
+                order = self._order_refs[row]
+                trade = Trade(
+                    trade_id=self._next_trade_id(),
+                    ts_event=ts_event,
+                    associated_order_id=order.order_id,
+                    trade_direction=order.order_direction,
+                    quantity=order.quantity,
+                    fill_at=bar_open,  # Raw fill price in points
+                    commission_and_fees=fee,  # Total fees in dollars
+                    fill_adjusted=fill_adjusted,  # Points, adjusted for fees
+                )
+                self._register_trade_execution(trade)
+            self._order_alive[market_rows] = False
+
+        # Pending limit and stop orders are not matched yet.
+
+        # Skip the dead prefix of the book on subsequent bars so settled
+        # (or cancelled) orders stop costing anything.
+        while start < n and not self._order_alive[start]:
+            start += 1
+        self._order_scan_start = start
 
     def _register_trade_execution(self, trade: Trade) -> None:
         pass
@@ -292,16 +423,15 @@ if __name__ == "__main__":
         def add_indicators(self) -> None:
             close = self._df["close"]
             detrend = close - close.rolling(window=7).mean()
-            self._df["cmb_detrend"] = detrend
-            self._df["cmb_detrend_sma20"] = detrend.rolling(window=20).mean()
-            self._df["cmb_detrend_bb_upper"] = (
-                self._df["cmb_detrend_sma20"] + 2 * detrend.rolling(window=20).std()
-            )
-            self._df["cmb_detrend_bb_lower"] = (
-                self._df["cmb_detrend_sma20"] - 2 * detrend.rolling(window=20).std()
+            sma20, bb_upper, bb_lower = _bollinger_bands(
+                detrend.to_numpy(dtype=np.float64), 20, 2.0
             )
+            self._df["cmb_detrend"] = detrend
+            self._df["cmb_detrend_sma20"] = sma20
+            self._df["cmb_detrend_bb_upper"] = bb_upper
+            self._df["cmb_detrend_bb_lower"] = bb_lower
 
-        def strategy(self, row: pd.Series) -> None:
+        def strategy(self, bar_index: int) -> None:
             pass
 
     backtester = Backtester()
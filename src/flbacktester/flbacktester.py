@@ -1,11 +1,14 @@
 import abc
+import heapq
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.dataset
 import logging
 from dataclasses import dataclass
 from enum import Enum
-import uuid
 from datetime import datetime
-from collections import deque
 
 pd.set_option("display.width", 1000)
 pd.set_option("display.max_columns", None)
@@ -30,36 +33,45 @@ class TradeDirection(Enum):
     SELL = "SELL"
 
 
-@dataclass
+# Integer codes used by the order book arrays.
+KIND_MARKET = 0
+KIND_LIMIT = 1
+KIND_STOP = 2
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+
+@dataclass(slots=True, frozen=True)
 class OrderBase:
-    order_id: uuid.UUID
+    order_id: int
     ts_event: datetime
     trade_direction: TradeDirection
     quantity: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MarketOrder(OrderBase):
     order_type: OrderType = OrderType.MARKET
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LimitOrder(OrderBase):
     limit_price: float
     order_type: OrderType = OrderType.LIMIT
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StopOrder(OrderBase):
     stop_price: float
     order_type: OrderType = OrderType.STOP
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Trade:
-    trade_id: uuid.UUID
-    ts_event: datetime
-    assoc_order_id: uuid.UUID
+    trade_id: int
+    ts_event: int  # Nanoseconds since epoch
+    assoc_order_id: int
     trade_direction: TradeDirection
     quantity: float
     fill_price: float
@@ -69,10 +81,32 @@ class FLBacktesterBase(abc.ABC):
     def __init__(self):
         self.EQUITY = 100000.0
         self.df = pd.DataFrame()
-        self.pending_market_orders: dict[uuid.UUID, MarketOrder] = {}
-        self.pending_limit_orders: dict[uuid.UUID, LimitOrder] = {}
-        self.pending_stop_orders: dict[uuid.UUID, StopOrder] = {}
-        self._trade_buffer: deque[dict] = deque(maxlen=1000)
+        self.position = 0.0
+        self._position_deltas = np.zeros(0)
+        self._order_capacity = 1024
+        self._order_count = 0
+        self._order_kinds = np.zeros(self._order_capacity, dtype=np.int8)
+        self._order_sides = np.zeros(self._order_capacity, dtype=np.int8)
+        self._order_prices = np.zeros(self._order_capacity)
+        self._order_refs: list[OrderBase] = []
+        self._order_id_counter = 0
+        self._trade_id_counter = 0
+        # Next-event structures: market orders fill unconditionally on the
+        # next bar; limit/stop orders wait in heaps keyed on trigger price
+        # so each bar only touches orders that can actually fill.
+        self._market_queue: list[int] = []
+        self._buy_limit_heap: list[tuple[float, int]] = []  # (-limit_price, row)
+        self._sell_limit_heap: list[tuple[float, int]] = []  # (limit_price, row)
+        self._buy_stop_heap: list[tuple[float, int]] = []  # (stop_price, row)
+        self._sell_stop_heap: list[tuple[float, int]] = []  # (-stop_price, row)
+        self._trade_capacity = 1024
+        self._trade_count = 0
+        self._trade_ids = np.zeros(self._trade_capacity, dtype=np.int64)
+        self._trade_ts = np.zeros(self._trade_capacity, dtype=np.int64)  # ns
+        self._trade_order_ids = np.zeros(self._trade_capacity, dtype=np.int64)
+        self._trade_sides = np.zeros(self._trade_capacity, dtype=np.int8)
+        self._trade_quantities = np.zeros(self._trade_capacity)
+        self._trade_fills = np.zeros(self._trade_capacity)
         self.executed_trades = pd.DataFrame(
             columns=[
                 "trade_id",
@@ -84,6 +118,16 @@ class FLBacktesterBase(abc.ABC):
             ]
         )
 
+    def _next_order_id(self) -> int:
+        order_id = self._order_id_counter
+        self._order_id_counter += 1
+        return order_id
+
+    def _next_trade_id(self) -> int:
+        trade_id = self._trade_id_counter
+        self._trade_id_counter += 1
+        return trade_id
+
     # 1. Setup methods
     def set_initial_equity(self, cash: float):
         self.EQUITY = cash
@@ -92,39 +136,38 @@ class FLBacktesterBase(abc.ABC):
     def load_data(self, path_to_csv: str, symbol: str) -> None:
         try:
             logger.info(f"Reading CSV file: {path_to_csv}")
-            self.df = pd.read_csv(
-                path_to_csv,
-                usecols=[
-                    "ts_event",
-                    "rtype",
-                    "open",
-                    "high",
-                    "low",
-                    "close",
-                    "volume",
-                    "symbol",
-                ],
-                dtype={
-                    "ts_event": int,
-                    "rtype": int,
-                    "open": int,
-                    "high": int,
-                    "low": int,
-                    "close": int,
-                    "volume": int,
-                    "symbol": str,
-                },
+            column_types = {
+                "ts_event": pa.int64(),
+                "rtype": pa.int64(),
+                "open": pa.int64(),
+                "high": pa.int64(),
+                "low": pa.int64(),
+                "close": pa.int64(),
+                "volume": pa.int64(),
+                "symbol": pa.dictionary(pa.int32(), pa.string()),
+            }
+            csv_format = pyarrow.dataset.CsvFileFormat(
+                convert_options=pyarrow.csv.ConvertOptions(column_types=column_types)
             )
+            dataset = pyarrow.dataset.dataset(path_to_csv, format=csv_format)
 
             logger.info(f"Filtering data for symbol {symbol}")
-            self.df = self.df[self.df["symbol"] == symbol]
+            table = dataset.to_table(
+                filter=pyarrow.dataset.field("symbol") == symbol,
+                columns=list(column_types),
+            )
+            self.df = table.to_pandas()
 
             logger.info("Converting timestamps and price values")
             self.df["ts_event"] = pd.to_datetime(self.df["ts_event"], unit="ns")
-            self.df["open"] = self.df["open"] / 1e9
-            self.df["high"] = self.df["high"] / 1e9
-            self.df["low"] = self.df["low"] / 1e9
-            self.df["close"] = self.df["close"] / 1e9
+            price_columns = ["open", "high", "low", "close"]
+            # Scale in float64 so tick-grid prices stay exact, then downcast:
+            # float32 represents all 0.25-tick prices in range exactly and
+            # halves the bandwidth of every rolling/compare pass downstream.
+            prices = np.multiply(self.df[price_columns].to_numpy(), 1e-9).astype(
+                np.float32
+            )
+            self.df[price_columns] = prices
 
             rtypes = self.df["rtype"].unique().tolist()
             if len(rtypes) != 1:
@@ -140,8 +183,6 @@ class FLBacktesterBase(abc.ABC):
                 f"...\n{self.df.tail().to_string(index=False)}"
             )
 
-            self.df["position"] = 0
-
         except Exception as e:
             logger.error(f"Error loading CSV file: {str(e)}")
             self.df = pd.DataFrame()
@@ -154,10 +195,28 @@ class FLBacktesterBase(abc.ABC):
             f"Backtester DataFrame with added Indicators:\n{self.df.head().to_string(index=False)}\n"
             f"...\n{self.df.tail().to_string(index=False)}"
         )
-        for _, row in self.df.iterrows():
-            self._process_orders(row)
-            self.strategy(row)
-            logger.debug(f"Processed Bar Event: {row['ts_event']}")
+        self.position = 0.0
+        self._position_deltas = np.zeros(len(self.df))
+        self._columns = {
+            column: self.df[column].to_numpy() for column in self.df.columns
+        }
+        # Iterate timestamps as raw int64 nanoseconds; converting back to
+        # datetime64 only happens at reporting time.
+        ts_ns = self._columns["ts_event"].view("int64")
+        opens = self._columns["open"]
+        highs = self._columns["high"]
+        lows = self._columns["low"]
+        n_bars = len(self.df)
+        progress_interval = max(n_bars // 100, 1)
+        for i, (ts_event, bar_open, bar_high, bar_low) in enumerate(
+            zip(ts_ns, opens, highs, lows)
+        ):
+            self._process_orders(i, ts_event, bar_open, bar_high, bar_low)
+            self.strategy(i)
+            if (i + 1) % progress_interval == 0:
+                logger.debug("Processed %d/%d bars", i + 1, n_bars)
+        self.df["position"] = self._position_deltas.cumsum()
+        self._finalize_trades()
 
     @abc.abstractmethod
     def indicators(self):
@@ -165,119 +224,153 @@ class FLBacktesterBase(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def strategy(self, row):
-        """Implement trading logic for each bar."""
+    def strategy(self, bar_index: int):
+        """Implement trading logic for the bar at ``bar_index``.
+
+        Per-bar values are read from the column arrays in ``self._columns``.
+        """
         pass
 
     # 3. Order management methods
     def submit_order(self, order: OrderBase) -> None:
+        if self._order_count == self._order_capacity:
+            self._grow_order_book()
+
+        row = self._order_count
+        side = SIDE_BUY if order.trade_direction == TradeDirection.BUY else SIDE_SELL
         if isinstance(order, MarketOrder):
-            self.pending_market_orders[order.order_id] = order
-            logger.info(f"Submitted market order {order.order_id}")
+            self._order_kinds[row] = KIND_MARKET
+            self._market_queue.append(row)
         elif isinstance(order, LimitOrder):
-            self.pending_limit_orders[order.order_id] = order
-            logger.info(f"Submitted limit order {order.order_id}")
+            self._order_kinds[row] = KIND_LIMIT
+            self._order_prices[row] = order.limit_price
+            if side == SIDE_BUY:
+                heapq.heappush(self._buy_limit_heap, (-order.limit_price, row))
+            else:
+                heapq.heappush(self._sell_limit_heap, (order.limit_price, row))
         elif isinstance(order, StopOrder):
-            self.pending_stop_orders[order.order_id] = order
-            logger.info(f"Submitted stop order {order.order_id}")
-
-    def _process_orders(self, row):
-        for order_id, order in list(self.pending_market_orders.items()):
-            trade = Trade(
-                trade_id=uuid.uuid4(),
-                ts_event=row["ts_event"],
-                assoc_order_id=order.order_id,
-                trade_direction=order.trade_direction,
-                quantity=order.quantity,
-                fill_price=row["open"],
+            self._order_kinds[row] = KIND_STOP
+            self._order_prices[row] = order.stop_price
+            if side == SIDE_BUY:
+                heapq.heappush(self._buy_stop_heap, (order.stop_price, row))
+            else:
+                heapq.heappush(self._sell_stop_heap, (-order.stop_price, row))
+        self._order_sides[row] = side
+        self._order_refs.append(order)
+        self._order_count += 1
+        logger.info(
+            f"Submitted {order.order_type.value.lower()} order {order.order_id}"
+        )
+
+    def _grow_order_book(self) -> None:
+        self._order_capacity *= 2
+        for name in ("_order_kinds", "_order_sides", "_order_prices"):
+            old = getattr(self, name)
+            new = np.zeros(self._order_capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def _process_orders(self, bar_index, ts_event, bar_open, bar_high, bar_low):
+        for row in self._market_queue:
+            self._fill_order(row, bar_open, ts_event, bar_index)
+        self._market_queue.clear()
+
+        # Pop only the orders whose trigger price is inside this bar's range.
+        while self._buy_limit_heap and -self._buy_limit_heap[0][0] >= bar_low:
+            _, row = heapq.heappop(self._buy_limit_heap)
+            self._fill_order(row, self._order_prices[row], ts_event, bar_index)
+
+        while self._sell_limit_heap and self._sell_limit_heap[0][0] <= bar_high:
+            _, row = heapq.heappop(self._sell_limit_heap)
+            self._fill_order(row, self._order_prices[row], ts_event, bar_index)
+
+        while self._buy_stop_heap and self._buy_stop_heap[0][0] <= bar_high:
+            _, row = heapq.heappop(self._buy_stop_heap)
+            self._fill_order(
+                row, max(self._order_prices[row], bar_open), ts_event, bar_index
             )
-            self._add_trade(trade)
-            logger.info(f"Filled market order: {trade}")
-            del self.pending_market_orders[order_id]
-
-        for order_id, order in list(self.pending_limit_orders.items()):
-            if (
-                order.trade_direction == TradeDirection.BUY
-                and order.limit_price >= row["low"]
-            ) or (
-                order.trade_direction == TradeDirection.SELL
-                and order.limit_price <= row["high"]
-            ):
-                trade = Trade(
-                    trade_id=uuid.uuid4(),
-                    ts_event=row["ts_event"],
-                    assoc_order_id=order.order_id,
-                    trade_direction=order.trade_direction,
-                    quantity=order.quantity,
-                    fill_price=order.limit_price,
-                )
-                self._add_trade(trade)
-                logger.info(f"Filled limit order: {trade}")
-                del self.pending_limit_orders[order_id]
-
-        for order_id, order in list(self.pending_stop_orders.items()):
-            if (
-                order.trade_direction == TradeDirection.BUY
-                and row["high"] >= order.stop_price
-            ) or (
-                order.trade_direction == TradeDirection.SELL
-                and row["low"] <= order.stop_price
-            ):
-                fill_price = (
-                    max(order.stop_price, row["open"])
-                    if order.trade_direction == TradeDirection.BUY
-                    else min(order.stop_price, row["open"])
-                )
-
-                trade = Trade(
-                    trade_id=uuid.uuid4(),
-                    ts_event=row["ts_event"],
-                    assoc_order_id=order.order_id,
-                    trade_direction=order.trade_direction,
-                    quantity=order.quantity,
-                    fill_price=fill_price,
-                )
-                self._add_trade(trade)
-                logger.info(f"Filled stop order: {trade}")
-                del self.pending_stop_orders[order_id]
 
-    # 4. Trade management methods
-    def _add_trade(self, trade: Trade) -> None:
-        trade_data = {
-            "trade_id": trade.trade_id,
-            "ts_event": trade.ts_event,
-            "assoc_order_id": trade.assoc_order_id,
-            "trade_direction": trade.trade_direction.value,
-            "quantity": trade.quantity,
-            "fill_price": trade.fill_price,
-        }
-        self._trade_buffer.append(trade_data)
+        while self._sell_stop_heap and -self._sell_stop_heap[0][0] >= bar_low:
+            _, row = heapq.heappop(self._sell_stop_heap)
+            self._fill_order(
+                row, min(self._order_prices[row], bar_open), ts_event, bar_index
+            )
 
-        position_change = (
-            trade.quantity
-            if trade.trade_direction == TradeDirection.BUY
-            else -trade.quantity
+    def _fill_order(
+        self, row: int, fill_price: float, ts_event, bar_index: int
+    ) -> None:
+        order = self._order_refs[row]
+        trade = Trade(
+            trade_id=self._next_trade_id(),
+            ts_event=ts_event,
+            assoc_order_id=order.order_id,
+            trade_direction=order.trade_direction,
+            quantity=order.quantity,
+            fill_price=fill_price,
         )
-        self.df.loc[
-            self.df["ts_event"] >= trade.ts_event, "position"
-        ] += position_change
-
-        if len(self._trade_buffer) >= self._trade_buffer.maxlen:
-            self._flush_trade_buffer()
-
-    def _flush_trade_buffer(self) -> None:
-        if not self._trade_buffer:
-            return
+        self._add_trade(trade, bar_index, int(self._order_sides[row]))
+        logger.info(f"Filled {order.order_type.value.lower()} order: {trade}")
 
-        new_trades = pd.DataFrame(list(self._trade_buffer))
-        self.executed_trades = pd.concat(
-            [self.executed_trades, new_trades], ignore_index=True
+    # 4. Trade management methods
+    def _add_trade(self, trade: Trade, bar_index: int, side: int) -> None:
+        if self._trade_count == self._trade_capacity:
+            self._grow_trade_log()
+
+        row = self._trade_count
+        self._trade_ids[row] = trade.trade_id
+        self._trade_ts[row] = trade.ts_event
+        self._trade_order_ids[row] = trade.assoc_order_id
+        self._trade_sides[row] = side
+        self._trade_quantities[row] = trade.quantity
+        self._trade_fills[row] = trade.fill_price
+        self._trade_count += 1
+
+        position_change = side * trade.quantity
+        self._position_deltas[bar_index] += position_change
+        self.position += position_change
+
+    def _grow_trade_log(self) -> None:
+        self._trade_capacity *= 2
+        for name in (
+            "_trade_ids",
+            "_trade_ts",
+            "_trade_order_ids",
+            "_trade_sides",
+            "_trade_quantities",
+            "_trade_fills",
+        ):
+            old = getattr(self, name)
+            new = np.zeros(self._trade_capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def _finalize_trades(self) -> None:
+        n = self._trade_count
+        # Wrap the typed trade arrays in Arrow (zero-copy for the numeric
+        # columns) and dictionary-encode the side so no object-dtype column
+        # is ever materialized.
+        side_codes = (self._trade_sides[:n] == SIDE_BUY).astype(np.int8)
+        table = pa.table(
+            {
+                "trade_id": pa.array(self._trade_ids[:n], type=pa.int64()),
+                "ts_event": pa.array(
+                    self._trade_ts[:n].view("datetime64[ns]"),
+                    type=pa.timestamp("ns"),
+                ),
+                "assoc_order_id": pa.array(self._trade_order_ids[:n], type=pa.int64()),
+                "trade_direction": pa.DictionaryArray.from_arrays(
+                    pa.array(side_codes, type=pa.int8()),
+                    pa.array([TradeDirection.SELL.value, TradeDirection.BUY.value]),
+                ),
+                "quantity": pa.array(self._trade_quantities[:n], type=pa.float64()),
+                "fill_price": pa.array(self._trade_fills[:n], type=pa.float64()),
+            }
         )
-        self._trade_buffer.clear()
+        self.executed_trades = table.to_pandas()
 
     # 5. Analysis methods
     def show_performance_metrics(self) -> None:
-        self._flush_trade_buffer()
+        self._finalize_trades()
         num_trades = len(self.executed_trades)
         logger.info(f"Performance Metrics:")
         logger.info(f"Total number of trades: {num_trades}")
@@ -289,26 +382,30 @@ if __name__ == "__main__":
         def indicators(self):
             self.df["SMA20_close"] = self.df["close"].rolling(window=20).mean()
             self.df["SMA100_close"] = self.df["close"].rolling(window=100).mean()
-
-        def strategy(self, row):
-            if row["position"] == 0:
-                if row["SMA20_close"] > row["SMA100_close"]:
+            fast_above = self.df["SMA20_close"] > self.df["SMA100_close"]
+            was_above = fast_above.shift(1, fill_value=False)
+            self.df["cross_up"] = fast_above & ~was_above
+            self.df["cross_dn"] = ~fast_above & was_above
+
+        def strategy(self, bar_index):
+            if self.position == 0:
+                if self._columns["cross_up"][bar_index]:
                     self.submit_order(
                         MarketOrder(
-                            order_id=uuid.uuid4(),
-                            ts_event=row["ts_event"],
+                            order_id=self._next_order_id(),
+                            ts_event=self._columns["ts_event"][bar_index],
                             trade_direction=TradeDirection.BUY,
                             quantity=100,
                         )
                     )
-            elif row["position"] > 0:
-                if row["SMA20_close"] < row["SMA100_close"]:
+            elif self.position > 0:
+                if self._columns["cross_dn"][bar_index]:
                     self.submit_order(
                         MarketOrder(
-                            order_id=uuid.uuid4(),
-                            ts_event=row["ts_event"],
+                            order_id=self._next_order_id(),
+                            ts_event=self._columns["ts_event"][bar_index],
                             trade_direction=TradeDirection.SELL,
-                            quantity=abs(row["position"]),
+                            quantity=abs(self.position),
                         )
                     )
 